@@ -1,11 +1,65 @@
 # database.py
 # Database models and fake data storage
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+
+class UserStore:
+    """
+    In-memory user storage laid out as parallel column lists
+
+    Each user occupies one index across all columns; lookups by id or
+    mail go through index maps instead of scanning.
+    """
+
+    FIELDS = ("id", "mail", "name", "phone", "password", "created_at")
+
+    def __init__(self, users: Iterable[Dict[str, Any]] = ()):
+        self.columns: Dict[str, List[Any]] = {field: [] for field in self.FIELDS}
+        self._by_id: Dict[str, int] = {}
+        self._by_mail: Dict[str, int] = {}
+        for user in users:
+            self.add(user)
+
+    def add(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a user and return it as a row dict"""
+        index = len(self.columns["id"])
+        for field in self.FIELDS:
+            self.columns[field].append(user[field])
+        self._by_id[user["id"]] = index
+        # Mail lookups resolve the first account registered under a mail
+        self._by_mail.setdefault(user["mail"], index)
+        return self.row(index)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Assemble the user at a column index as a dict"""
+        return {field: self.columns[field][index] for field in self.FIELDS}
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        index = self._by_id.get(user_id)
+        return None if index is None else self.row(index)
+
+    def index_of_mail(self, mail: str) -> Optional[int]:
+        """Column index of the first user registered under a mail"""
+        return self._by_mail.get(mail)
+
+    def iter_columns(self, fields: Iterable[str]) -> Iterator[Tuple[Any, ...]]:
+        """Walk the given columns in insertion order, one tuple per user"""
+        return zip(*(self.columns[field] for field in fields))
+
+    def __getitem__(self, user_id: str) -> Dict[str, Any]:
+        return self.row(self._by_id[user_id])
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
 
 # In-memory user database
-fake_users_db: Dict[str, Dict[str, Any]] = {
-    "user1": {
+fake_users_db = UserStore([
+    {
         "id": "user1",
         "mail": "john@example.com",
         "name": "John Doe",
@@ -13,7 +67,7 @@ fake_users_db: Dict[str, Dict[str, Any]] = {
         "password": "hashed_password_123",
         "created_at": "2024-01-01T10:00:00Z"
     },
-    "user2": {
+    {
         "id": "user2",
         "mail": "jane@example.com",
         "name": "Jane Smith",
@@ -21,4 +75,7 @@ fake_users_db: Dict[str, Dict[str, Any]] = {
         "password": "hashed_password_456",
         "created_at": "2024-01-02T10:00:00Z"
     }
-}
+])
+
+# Sessions ended by a token refresh: session id -> time the revocation can be dropped
+revoked_sessions: Dict[str, int] = {}
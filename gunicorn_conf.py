@@ -0,0 +1,21 @@
+# gunicorn_conf.py
+# Gunicorn settings for serving the API with Uvicorn workers
+#
+# Run with: gunicorn main:app -c gunicorn_conf.py
+
+import os
+
+bind = "0.0.0.0:8000"
+
+# Users live in process memory, so a user created on one worker is invisible
+# to the others. Stay on one worker unless WEB_CONCURRENCY opts in; set
+# TOKEN_SECRET as well so every worker accepts the same tokens.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Load the app once in the master so the seed data and precomputed
+# responses are shared with workers copy-on-write
+preload_app = True
+
+loglevel = "warning"
+accesslog = None
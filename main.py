@@ -2,9 +2,16 @@
 # FastAPI application for testing breaking change detection
 # Clean, modular structure with separated concerns
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from fastapi import FastAPI, HTTPException, Response
+from time import time, gmtime, strftime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import orjson
 
 from models import (
     UserResponse,
@@ -13,26 +20,194 @@ from models import (
     CreateUserRequest,
     RefreshTokenRequest
 )
-from database import fake_users_db
+from database import fake_users_db, revoked_sessions
+from middleware import CheapCORS
 
 # ============================================
 # APP INITIALIZATION
 # ============================================
 
+# Interactive docs and the OpenAPI spec are disabled in production
+IS_PROD = os.getenv("ENV") == "prod"
+
 app = FastAPI(
     title="Sample User API",
     version="1.0.0",
-    description="API for testing breaking change detection"
+    description="API for testing breaking change detection",
+    openapi_url=None if IS_PROD else "/openapi.json",
+    docs_url=None if IS_PROD else "/docs",
+    redoc_url=None if IS_PROD else "/redoc"
 )
 
 # Enable CORS for React frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(CheapCORS)
+
+# Route handlers are `async def` and run directly on the event loop, with no
+# threadpool hop. They MUST remain non-blocking; use httpx.AsyncClient or
+# asyncpg if I/O is added.
+
+# ============================================
+# HELPERS
+# ============================================
+
+def _utcnow_z() -> str:
+    """Current UTC time as an ISO 8601 string with microseconds and 'Z' suffix"""
+    t = time()
+    return strftime("%Y-%m-%dT%H:%M:%S", gmtime(t)) + f".{int((t % 1) * 1e6):06d}Z"
+
+
+# Stored user keys exposed through UserResponse
+_USER_FIELDS = tuple(UserResponse.model_fields)
+
+
+def _user_view_dict(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored user onto the UserResponse fields as a plain dict"""
+    return {k: user[k] for k in _USER_FIELDS}
+
+
+# Tokens are signed rather than stored, so any worker can verify them.
+# Set TOKEN_SECRET when running more than one process; the random fallback
+# is only shared by workers forked from the same parent.
+TOKEN_SECRET = os.getenv("TOKEN_SECRET", "").encode() or secrets.token_bytes(32)
+ACCESS_TOKEN_TTL = 3600  # 1 hour
+REFRESH_TOKEN_TTL = 7 * 24 * 3600  # 7 days
+
+_REF_PREFIX = "refresh_"
+
+
+def _sign(kind: str, payload: str) -> str:
+    """HMAC-SHA256 signature of a token payload, bound to the token kind"""
+    digest = hmac.new(TOKEN_SECRET, f"{kind}:{payload}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _make_token(kind: str, user_id: str, session_id: str, ttl: int) -> str:
+    """Build a '<user_id>.<session_id>.<expires_at>.<signature>' token"""
+    payload = f"{user_id}.{session_id}.{int(time()) + ttl}"
+    return f"{payload}.{_sign(kind, payload)}"
+
+
+def _verify_token(kind: str, token: str) -> Optional[Tuple[str, str, int]]:
+    """Return (user_id, session_id, expires_at) for a valid, unexpired, unrevoked token"""
+    payload, _, signature = token.rpartition(".")
+    if not hmac.compare_digest(signature.encode(), _sign(kind, payload).encode()):
+        return None
+    user_id, session_id, expires_at = payload.rsplit(".", 2)
+    if not expires_at.isdecimal() or int(expires_at) <= time():
+        return None
+    if session_id in revoked_sessions:
+        return None
+    return user_id, session_id, int(expires_at)
+
+
+def _issue_tokens(user_id: str) -> Tuple[str, str]:
+    """Generate an access token and refresh token sharing a new session"""
+    session_id = secrets.token_urlsafe(12)
+    token = _make_token("access", user_id, session_id, ACCESS_TOKEN_TTL)
+    refresh_token = _REF_PREFIX + _make_token("refresh", user_id, session_id, REFRESH_TOKEN_TTL)
+    return token, refresh_token
+
+
+# Access token validation cache: blake2s(token) -> (cached_until, user_id, session_id).
+# Only valid tokens are cached, never past their own expiry; a session maps to
+# its cached key so revoking the session evicts it.
+TOKEN_CACHE_MAXSIZE = 10_000
+TOKEN_CACHE_TTL = 60  # seconds
+_token_cache: "OrderedDict[bytes, Tuple[float, str, str]]" = OrderedDict()
+_token_cache_keys: Dict[str, bytes] = {}
+
+
+def _access_token_claims(token: str) -> Optional[Tuple[str, str]]:
+    """Verify an access token, reusing recent successful checks"""
+    key = hashlib.blake2s(token.encode(), digest_size=16).digest()
+    now = time()
+    
+    cached = _token_cache.get(key)
+    if cached is not None:
+        if cached[0] > now:
+            _token_cache.move_to_end(key)
+            return cached[1], cached[2]
+        del _token_cache[key]
+        _token_cache_keys.pop(cached[2], None)
+    
+    claims = _verify_token("access", token)
+    if claims is None:
+        return None
+    user_id, session_id, expires_at = claims
+    
+    if len(_token_cache) >= TOKEN_CACHE_MAXSIZE:
+        # Evict the least recently used entry
+        _, evicted = _token_cache.popitem(last=False)
+        _token_cache_keys.pop(evicted[2], None)
+    _token_cache[key] = (min(now + TOKEN_CACHE_TTL, expires_at), user_id, session_id)
+    _token_cache_keys[session_id] = key
+    
+    return user_id, session_id
+
+
+def _revoke_session(session_id: str) -> None:
+    """
+    Reject every token of a session until they would have expired anyway
+
+    Revocations are kept in process memory; with several workers the
+    other processes still rely on token expiry.
+    """
+    now = int(time())
+    # Entries are appended with the same TTL, so expired ones sit at the front
+    while revoked_sessions:
+        oldest = next(iter(revoked_sessions))
+        if revoked_sessions[oldest] > now:
+            break
+        del revoked_sessions[oldest]
+    revoked_sessions[session_id] = now + REFRESH_TOKEN_TTL
+    
+    key = _token_cache_keys.pop(session_id, None)
+    if key is not None:
+        _token_cache.pop(key, None)
+
+# ============================================
+# PRECOMPUTED RESPONSES
+# ============================================
+
+# Static payloads are encoded once at import time
+_ROOT_BYTES = orjson.dumps({
+    "message": "User API is running",
+    "version": "1.0.0",
+    "endpoints": [
+        "GET /users/{id}",
+        "POST /users",
+        "POST /login",
+        "GET /health"
+    ]
+})
+
+_HEALTH_BYTES = b'{"status":"healthy"}'
+
+# /api/status only varies in timestamp and users_count
+_STATUS_PREFIX = b'{"status":"running","version":"1.0.0","timestamp":"'
+_STATUS_SUFFIX = b'","users_count":'
+
+# Serialized /api/users body, extended one user at a time on create
+_user_json_chunks: List[bytes] = [
+    orjson.dumps(dict(zip(_USER_FIELDS, row)))
+    for row in fake_users_db.iter_columns(_USER_FIELDS)
+]
+_users_list_bytes = b"[" + b",".join(_user_json_chunks) + b"]"
+
+# Serialized /api/users/{user_id} bodies, filled on first read or on create
+_user_bytes_cache: Dict[str, bytes] = {}
+
+# /api/profile bodies up to the open lastLogin string, keyed by user id
+_profile_prefix_cache: Dict[str, bytes] = {}
+
+
+def _profile_prefix_for(user_id: str) -> bytes:
+    """Serialized profile fields, left open so lastLogin can be appended"""
+    prefix = _profile_prefix_cache.get(user_id)
+    if prefix is None:
+        body = orjson.dumps(_user_view_dict(fake_users_db[user_id]))
+        prefix = _profile_prefix_cache[user_id] = body[:-1] + b',"lastLogin":"'
+    return prefix
 
 # ============================================
 # HEALTH CHECK ENDPOINTS
@@ -41,39 +216,35 @@ app.add_middleware(
 @app.get("/")
 async def root():
     """Root endpoint - API health check"""
-    return {
-        "message": "User API is running",
-        "version": "1.0.0",
-        "endpoints": [
-            "GET /users/{id}",
-            "POST /users",
-            "POST /login",
-            "GET /health"
-        ]
-    }
+    return Response(_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    return {"status": "healthy"}
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get("/api/status")
 async def get_status():
     """Get API status and metadata"""
-    return {
-        "status": "running",
-        "version": "1.0.0",
-        "timestamp": datetime.now().isoformat() + "Z",
-        "users_count": len(fake_users_db)
-    }
+    timestamp = _utcnow_z()
+    return Response(
+        b"".join((
+            _STATUS_PREFIX,
+            timestamp.encode(),
+            _STATUS_SUFFIX,
+            str(len(fake_users_db)).encode(),
+            b"}"
+        )),
+        media_type="application/json"
+    )
 
 # ============================================
 # USER ENDPOINTS
 # ============================================
 
-@app.get("/api/users/{user_id}", response_model=UserResponse)
+@app.get("/api/users/{user_id}", responses={200: {"model": UserResponse}})
 async def get_user(user_id: str):
     """
     Get user by ID
@@ -88,17 +259,14 @@ async def get_user(user_id: str):
     3. Change response type from object to array
     4. Change mail type from string to integer
     """
-    if user_id not in fake_users_db:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user = fake_users_db[user_id]
-    return UserResponse(
-        id=user["id"],
-        mail=user["mail"],
-        name=user["name"],
-        phone=user["phone"],
-        created_at=user["created_at"]
-    )
+    body = _user_bytes_cache.get(user_id)
+    if body is None:
+        user = fake_users_db.get(user_id)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        body = _user_bytes_cache[user_id] = orjson.dumps(_user_view_dict(user))
+    
+    return Response(body, media_type="application/json")
 
 
 @app.get("/api/users")
@@ -108,16 +276,7 @@ async def list_users():
     
     Returns: List of UserResponse objects
     """
-    return [
-        UserResponse(
-            id=user["id"],
-            mail=user["mail"],
-            name=user["name"],
-            phone=user["phone"],
-            created_at=user["created_at"]
-        )
-        for user in fake_users_db.values()
-    ]
+    return Response(_users_list_bytes, media_type="application/json")
 
 
 @app.post("/api/users")
@@ -133,32 +292,30 @@ async def create_user(request: CreateUserRequest):
     
     Returns: UserResponse with all fields
     """
+    global _users_list_bytes
+    
     new_user_id = f"user{len(fake_users_db) + 1}"
     
-    new_user = {
+    new_user = fake_users_db.add({
         "id": new_user_id,
         "mail": request.mail,
         "password": request.password,
         "name": request.name,
         "phone": request.phone,
-        "created_at": datetime.now().isoformat() + "Z"
-    }
+        "created_at": _utcnow_z()
+    })
     
-    fake_users_db[new_user_id] = new_user
+    body = _user_bytes_cache[new_user["id"]] = orjson.dumps(_user_view_dict(new_user))
+    _user_json_chunks.append(body)
+    _users_list_bytes = b"[" + b",".join(_user_json_chunks) + b"]"
     
-    return UserResponse(
-        id=new_user["id"],
-        mail=new_user["mail"],
-        name=new_user["name"],
-        phone=new_user["phone"],
-        created_at=new_user["created_at"]
-    )
+    return Response(body, media_type="application/json")
 
 # ============================================
 # AUTHENTICATION ENDPOINTS
 # ============================================
 
-@app.post("/api/login", response_model=LoginResponse)
+@app.post("/api/login", responses={200: {"model": LoginResponse}})
 async def login(request: LoginRequest):
     """
     User login endpoint
@@ -174,36 +331,32 @@ async def login(request: LoginRequest):
     4. Remove user object from response
     """
     # Find user by mail
-    user = None
-    user_id = None
-    
-    for uid, u in fake_users_db.items():
-        if u["mail"] == request.mail:
-            user = u
-            user_id = uid
-            break
+    index = fake_users_db.index_of_mail(request.mail)
     
-    if not user:
+    if index is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Validate password
-    if user["password"] != request.password:
+    columns = fake_users_db.columns
+    if columns["password"][index] != request.password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Generate fake tokens
-    token = f"token_jwt_{user_id}_{datetime.now().timestamp()}"
-    refresh_token = f"refresh_{user_id}_{datetime.now().timestamp()}"
-    
-    return LoginResponse(
-        success=True,
-        token=token,
-        refreshToken=refresh_token,
-        expiresIn=3600,  # 1 hour
-        user={
-            "id": user["id"],
-            "mail": user["mail"],
-            "name": user["name"]
-        }
+    user_id = columns["id"][index]
+    token, refresh_token = _issue_tokens(user_id)
+    
+    return Response(
+        orjson.dumps({
+            "success": True,
+            "token": token,
+            "refreshToken": refresh_token,
+            "expiresIn": ACCESS_TOKEN_TTL,
+            "user": {
+                "id": user_id,
+                "mail": columns["mail"][index],
+                "name": columns["name"][index]
+            }
+        }),
+        media_type="application/json"
     )
 
 
@@ -217,18 +370,28 @@ async def refresh_token(request: RefreshTokenRequest):
     
     Returns: New token and refresh token
     """
-    # Validate refresh token (simplified)
-    if not request.refresh_token.startswith("refresh_"):
+    # Cheap reject for malformed tokens before checking the signature
+    if not request.refresh_token.startswith(_REF_PREFIX):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    claims = _verify_token("refresh", request.refresh_token[len(_REF_PREFIX):])
+    if claims is None or claims[0] not in fake_users_db:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     
-    new_token = f"token_jwt_refreshed_{datetime.now().timestamp()}"
-    new_refresh_token = f"refresh_refreshed_{datetime.now().timestamp()}"
+    # Rotate: the old refresh token and its access token stop working
+    user_id, session_id, _ = claims
+    _revoke_session(session_id)
     
-    return {
-        "token": new_token,
-        "refreshToken": new_refresh_token,
-        "expiresIn": 3600
-    }
+    new_token, new_refresh_token = _issue_tokens(user_id)
+    
+    return Response(
+        orjson.dumps({
+            "token": new_token,
+            "refreshToken": new_refresh_token,
+            "expiresIn": ACCESS_TOKEN_TTL
+        }),
+        media_type="application/json"
+    )
 
 # ============================================
 # PROFILE ENDPOINTS
@@ -243,21 +406,16 @@ async def get_profile(token: str):
     
     Returns: User profile data
     """
-    # Simple token validation (in real app, validate JWT)
-    if not token.startswith("token_"):
+    claims = _access_token_claims(token)
+    if claims is None or claims[0] not in fake_users_db:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    # For demo, return user1
-    user = fake_users_db["user1"]
+    user_id = claims[0]
     
-    return {
-        "id": user["id"],
-        "mail": user["mail"],
-        "name": user["name"],
-        "phone": user["phone"],
-        "created_at": user["created_at"],
-        "lastLogin": datetime.now().isoformat() + "Z"
-    }
+    return Response(
+        b"".join((_profile_prefix_for(user_id), _utcnow_z().encode(), b'"}')),
+        media_type="application/json"
+    )
 
 # ============================================
 # SERVER STARTUP
@@ -267,8 +425,9 @@ if __name__ == "__main__":
     import uvicorn
     
     print("🚀 Starting FastAPI server...")
-    print("📖 API Docs: http://localhost:8000/docs")
-    print("📡 OpenAPI Spec: http://localhost:8000/openapi.json")
+    if not IS_PROD:
+        print("📖 API Docs: http://localhost:8000/docs")
+        print("📡 OpenAPI Spec: http://localhost:8000/openapi.json")
     print("\nAvailable endpoints:")
     print("  GET  /                    - Health check")
     print("  GET  /health              - Health status")
@@ -280,4 +439,16 @@ if __name__ == "__main__":
     print("  POST /api/refresh-token   - Refresh authentication token")
     print("  GET  /api/profile         - Get user profile")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # The in-memory database lives inside one process, so writes are only
+    # visible to the worker that made them. Stay on a single worker unless
+    # the operator opts in via WEB_CONCURRENCY.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        log_level="warning",
+        access_log=False
+    )
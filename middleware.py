@@ -0,0 +1,54 @@
+# middleware.py
+# Lightweight ASGI middleware
+
+# Precomputed CORS headers for a wildcard policy
+CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"*"),
+    (b"access-control-allow-headers", b"*"),
+]
+
+# Preflight responses carry the CORS headers plus a cache lifetime
+PREFLIGHT_HEADERS = CORS_HEADERS + [
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+
+
+def _is_preflight(headers) -> bool:
+    """A CORS preflight carries both Origin and Access-Control-Request-Method"""
+    names = {name for name, _ in headers}
+    return b"origin" in names and b"access-control-request-method" in names
+
+
+class CheapCORS:
+    """
+    CORS middleware for an allow-everything policy
+
+    Appends fixed headers to every HTTP response and answers preflight
+    requests directly, without evaluating origins per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and _is_preflight(scope["headers"]):
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": PREFLIGHT_HEADERS,
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or ()) + CORS_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
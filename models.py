@@ -8,6 +8,7 @@ from typing import Optional, Dict, Any
 class UserResponse(BaseModel):
     """Response model for user data"""
     id: str
+    mail: str
     name: str
     phone: str
     created_at: str
@@ -19,13 +20,20 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class LoginUser(BaseModel):
+    """User summary embedded in the login response"""
+    id: str
+    mail: str
+    name: str
+
+
 class LoginResponse(BaseModel):
     """Response model for login"""
     success: bool
     token: str
     refreshToken: str
     expiresIn: int
-    user: dict
+    user: LoginUser
 
 
 class CreateUserRequest(BaseModel):